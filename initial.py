@@ -1,15 +1,20 @@
+import io
+import os
 import sys
 import pandas as pd
 import requests
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QPushButton, QComboBox, QWidget, 
-    QHBoxLayout, QLabel, QTextEdit, QSplitter, QTabWidget, QTableWidget, QTableWidgetItem, QSpinBox, QFileDialog
+    QHBoxLayout, QLabel, QTextEdit, QSplitter, QTabWidget, QTableWidget, QTableWidgetItem, QSpinBox, QFileDialog,
+    QCheckBox
 )
 from PySide6.QtGui import QWheelEvent, QPen, QBrush, QPolygonF
-from PySide6.QtCore import Qt, QThread, Signal, QPointF
+from PySide6.QtCore import Qt, QThread, Signal, QPointF, QFileSystemWatcher, QTimer
 from NodeGraphQt import NodeGraph, BaseNode, BackdropNode
 
 OLLAMA_API_URL = "http://localhost:11434/api/generate"  # Adjust API endpoint if needed
+CHECK_BYTES = 1024  # Bytes compared at the start and end of what was read to spot a rewritten file
+WATCH_DELAY_MS = 300  # Wait for a burst of appends to settle before reloading
 
 
 from NodeGraphQt import BaseNode
@@ -85,16 +90,117 @@ class InputNode(BaseNode):
         super(InputNode, self).__init__()
         self.add_output("DataFrame")
         self.add_text_input("file_path", "File Path:")
+        self.add_checkbox("incremental", "", text="Incremental Load", state=False)
         self._data = None
-        
-
-    def load_data(self):
+        self.reset_read_state()
+
+    def reset_read_state(self):
+        """Forget how much of the file was read so the next load starts from byte 0."""
+        self._path = None
+        self._offset = 0
+        self._row_count = 0
+        self._head = b""
+        self._tail = b""
+        self._pending = b""
+
+    def load_data(self, incremental=False):
+        """Load the CSV and return (rows, is_delta).
+
+        In incremental mode only the bytes after the last complete line read so far
+        are parsed; new rows are added to self._data and returned with is_delta True.
+        The whole file is reparsed on the first load, while it has no rows yet (so the
+        column types come from real values), or when it was truncated or rewritten.
+        Returns (None, False) if the file could not be read.
+        """
         file_path = self.get_property("file_path")
         try:
-            self._data = pd.read_csv(file_path)
+            if incremental and not self._data_is_empty() and not self.is_rewritten(file_path):
+                try:
+                    rows, is_delta = self.read_tail(file_path)
+                except (ValueError, TypeError) as e:
+                    # New values that do not fit the existing column types
+                    print(f"Reloading {file_path}: {e}")
+                    rows, is_delta = None, False
+                if rows is not None:
+                    if is_delta:
+                        print(f"Appended {len(rows)} rows, {self._row_count} rows in total")
+                    else:
+                        print(f"Reread unfinished last line, {self._row_count} rows in total")
+                    return rows, is_delta
+            if incremental:
+                self.read_full(file_path)
+            else:
+                self.reset_read_state()
+                self._data = pd.read_csv(file_path)
             print(f"Data loaded:\n{self._data.head()}")
+            return self._data, False
         except Exception as e:
             print(f"Error loading data: {e}")
+            self.reset_read_state()
+            return None, False
+
+    def _data_is_empty(self):
+        return self._data is None or self._data.empty
+
+    def is_rewritten(self, file_path):
+        """Check whether the complete lines read so far are no longer the start of the file."""
+        if self._data is None or file_path != self._path or self._offset == 0:
+            return True
+        try:
+            if os.path.getsize(file_path) < self._offset:
+                return True
+            with open(file_path, "rb") as f:
+                head = f.read(len(self._head))
+                f.seek(self._offset - len(self._tail))
+                tail = f.read(len(self._tail))
+        except OSError:
+            return True
+        return head != self._head or tail != self._tail
+
+    def read_full(self, file_path):
+        """Parse the whole file and remember where its last complete line ends."""
+        with open(file_path, "rb") as f:
+            content = f.read()
+        self.reset_read_state()
+        self._data = pd.read_csv(io.BytesIO(content))
+        self._remember(file_path, content)
+
+    def read_tail(self, file_path):
+        """Parse the bytes after the last complete line and return (rows, is_delta).
+
+        A last line without a newline is shown like any other row but read again on
+        the next call. If it changed by then, it is replaced and self._data is
+        returned with is_delta False, since that is no longer a plain append.
+        Columns keep the types of self._data; a ValueError or TypeError is raised when
+        the new values cannot be read as those types.
+        """
+        with open(file_path, "rb") as f:
+            f.seek(self._offset)
+            content = f.read()
+        if content == self._pending:
+            return self._data.iloc[0:0], True
+        replaced = bool(self._pending.strip())
+        base = self._data.iloc[:-1] if replaced else self._data
+        if content.strip():
+            rows = pd.read_csv(io.BytesIO(content), header=None, names=base.columns,
+                               dtype=base.dtypes.to_dict())
+        else:
+            rows = base.iloc[0:0]
+        rows.index = pd.RangeIndex(len(base), len(base) + len(rows))
+        is_delta = not replaced
+        self._data = pd.concat([base, rows]) if not rows.empty else base
+        self._remember(file_path, content)
+        return (rows if is_delta else self._data), is_delta
+
+    def _remember(self, file_path, content):
+        """Move the read position to the end of the last complete line in content."""
+        end = content.rfind(b"\n") + 1
+        self._path = file_path
+        self._head = (self._head + content[:min(end, CHECK_BYTES)])[:CHECK_BYTES]
+        self._tail = (self._tail + content[max(0, end - CHECK_BYTES):end])[-CHECK_BYTES:]
+        self._offset += end
+        self._pending = content[end:]
+        self._row_count = len(self._data)
 
     def on_property_changed(self, name, value):
         if name == "file_path":
@@ -128,6 +234,9 @@ class CalculationNode(BaseNode):
         self.add_output("Calculated DataFrame")
         self.add_text_input("formula", "Formula:")
         self.add_text_input("query", "Describe Calculation:")
+        self.add_checkbox("row_wise", "", text="Row-wise Formula", state=False)
+        self._data = None
+        self._formula = None
 
     def apply_calculation(self, df):
         formula = self.get_property("formula")
@@ -139,6 +248,90 @@ class CalculationNode(BaseNode):
             print(f"Error in calculation: {e}")
             return df, str(e)
 
+    def update_calculation(self, df, new_rows=None):
+        """Apply the formula, reusing the last result when rows were only appended.
+
+        A row-wise formula is evaluated on new_rows alone and appended to the cached
+        result; otherwise, or when the cache does not line up with df, the formula is
+        recomputed over the full df. Returns (data, delta, error) where delta is None
+        after a full recompute.
+        """
+        formula = self.get_property("formula")
+        if (new_rows is not None and self._data is not None and formula == self._formula
+                and self.get_property("row_wise")
+                and len(self._data) + len(new_rows) == len(df)):
+            if new_rows.empty:
+                return self._data, new_rows, None
+            rows, error = self.apply_calculation(new_rows.copy())
+            if error:
+                # The failed rows are not in the cache, so the next run must start over
+                self._data = None
+                return df, None, error
+            self._data = pd.concat([self._data, rows])
+            return self._data, rows, None
+        data, error = self.apply_calculation(df.copy())
+        self._data = None if error else data
+        self._formula = formula
+        return data, None, error
+
+class AggregateNode(BaseNode):
+    __identifier__ = "custom.nodes"
+    NODE_NAME = "Aggregate Node"
+    FUNCTIONS = ["sum", "count", "mean", "min", "max"]
+
+    def __init__(self):
+        super(AggregateNode, self).__init__()
+        self.add_input("DataFrame")
+        self.add_output("Aggregated DataFrame")
+        self.add_text_input("group_by", "Group By:")
+        self.add_text_input("column", "Column:")
+        self.add_combo_menu("function", "Function:", items=self.FUNCTIONS)
+        self._partials = None
+        self._columns = None
+        self._covered = 0
+        self._last_row = None
+
+    def partial_aggregate(self, df):
+        """Reduce df to per-group sum, count, min and max, which can be merged later."""
+        group_by = self.get_property("group_by")
+        column = self.get_property("column")
+        keys = df[group_by] if group_by else pd.Series("All", index=df.index, name="Group")
+        return df.groupby(keys)[column].agg(["sum", "count", "min", "max"])
+
+    def update_aggregate(self, df, new_rows=None):
+        """Aggregate df, folding only new_rows into the kept partials when possible.
+
+        The partials are only reused when the rows they cover plus new_rows add up to
+        df and the last covered row is still the same, so a rewired input is
+        aggregated again. Returns (data, error) with one row per group.
+        """
+        columns = (self.get_property("group_by"), self.get_property("column"))
+        try:
+            if (new_rows is not None and self._partials is not None and columns == self._columns
+                    and self._covered + len(new_rows) == len(df)
+                    and df.iloc[self._covered - 1:self._covered].equals(self._last_row)):
+                merged = pd.concat([self._partials, self.partial_aggregate(new_rows)])
+                self._partials = merged.groupby(level=0).agg(
+                    {"sum": "sum", "count": "sum", "min": "min", "max": "max"})
+                self._covered += len(new_rows)
+            else:
+                self._partials = self.partial_aggregate(df)
+                self._columns = columns
+                self._covered = len(df)
+            self._last_row = df.iloc[len(df) - 1:len(df)]
+            function = self.get_property("function")
+            if function == "mean":
+                result = self._partials["sum"] / self._partials["count"]
+            else:
+                result = self._partials[function]
+            data = result.rename(f"{columns[1]}_{function}").reset_index()
+            print(f"Aggregated Data:\n{data.head()}")
+            return data, None
+        except Exception as e:
+            print(f"Error in aggregation: {e}")
+            self._partials = None
+            return df, str(e)
+
 class NodeGraphApp(QMainWindow):
     def __init__(self):
         super(NodeGraphApp, self).__init__()
@@ -152,7 +345,7 @@ class NodeGraphApp(QMainWindow):
         toolbar_layout = QHBoxLayout()
         self.add_node_button = QPushButton("Add Node")
         self.node_type_combo = QComboBox()
-        self.node_type_combo.addItems(["Input Node", "Calculation Node"])
+        self.node_type_combo.addItems(["Input Node", "Calculation Node", "Aggregate Node"])
         self.process_graph_button = QPushButton("Process Graph")
         self.run_button = QPushButton("Run Query")
         toolbar_layout.addWidget(self.add_node_button)
@@ -213,6 +406,7 @@ class NodeGraphApp(QMainWindow):
 
         self.graph.register_node(InputNode)
         self.graph.register_node(CalculationNode)
+        self.graph.register_node(AggregateNode)
 
         
         self.add_node_button.clicked.connect(self.add_node)
@@ -228,6 +422,20 @@ class NodeGraphApp(QMainWindow):
         toolbar_layout.addWidget(self.add_backdrop_button)
         self.add_backdrop_button.clicked.connect(self.add_backdrop)
 
+        # Reload incremental Input Nodes when their files change on disk
+        self.watch_checkbox = QCheckBox("Watch Files")
+        toolbar_layout.addWidget(self.watch_checkbox)
+        self.file_watcher = QFileSystemWatcher(self)
+        self.changed_files = set()
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(WATCH_DELAY_MS)
+        self.watch_checkbox.toggled.connect(self.update_file_watcher)
+        self.file_watcher.fileChanged.connect(self.on_file_changed)
+        self.watch_timer.timeout.connect(self.reload_changed_files)
+        self.graph.property_changed.connect(self.on_node_property_changed)
+        self.graph.nodes_deleted.connect(self.update_file_watcher)
+
 
         self.save_button.clicked.connect(self.save_graph)
         self.load_button.clicked.connect(self.load_graph)
@@ -244,6 +452,8 @@ class NodeGraphApp(QMainWindow):
             node = self.graph.create_node("custom.nodes.InputNode")
         elif node_type == "Calculation Node":
             node = self.graph.create_node("custom.nodes.CalculationNode")
+        elif node_type == "Aggregate Node":
+            node = self.graph.create_node("custom.nodes.AggregateNode")
         else:
             return
         node.set_pos(0, 0)
@@ -256,26 +466,83 @@ class NodeGraphApp(QMainWindow):
             return
         for input_node in input_nodes:
             self.process_node(input_node, None)
+        self.update_file_watcher()
 
-    def process_node(self, node, incoming_data):
+    def process_node(self, node, incoming_data, new_rows=None, changes_only=False):
+        """Run node and everything downstream of it.
+
+        new_rows holds the rows appended to incoming_data since the last run, or is
+        None when incoming_data was recomputed from scratch. With changes_only set,
+        an Input Node whose file has no new rows stops here instead of rerunning the
+        nodes after it.
+        """
         if isinstance(node, InputNode):
-            node.load_data()
+            rows, is_delta = node.load_data(node.get_property("incremental"))
+            if rows is None:
+                return
+            if changes_only and is_delta and rows.empty:
+                return
             data = node._data
+            new_rows = rows if is_delta else None
             self.display_dataframe(data)
         elif isinstance(node, CalculationNode):
-            if incoming_data is not None:
-                data, error_message = node.apply_calculation(incoming_data)
-                if error_message:
-                    self.error_console.setPlainText(f"Error: {error_message}")
-                    self.output_tabs.setCurrentIndex(2)
-                else:
-                    self.display_dataframe(data)
-                    self.output_tabs.setCurrentIndex(1)
+            if incoming_data is None:
+                return
+            data, new_rows, error_message = node.update_calculation(incoming_data, new_rows)
+            self.show_result(data, error_message)
+        elif isinstance(node, AggregateNode):
+            if incoming_data is None:
+                return
+            data, error_message = node.update_aggregate(incoming_data, new_rows)
+            new_rows = None
+            self.show_result(data, error_message)
         for output_port in node.output_ports():
             connected_ports = output_port.connected_ports()
             for connected_port in connected_ports:
                 next_node = connected_port.node()
-                self.process_node(next_node, data)
+                self.process_node(next_node, data, new_rows)
+
+    def show_result(self, data, error_message):
+        if error_message:
+            self.error_console.setPlainText(f"Error: {error_message}")
+            self.output_tabs.setCurrentIndex(2)
+        else:
+            self.display_dataframe(data)
+            self.output_tabs.setCurrentIndex(1)
+
+    def watched_input_nodes(self):
+        return [node for node in self.graph.all_nodes()
+                if isinstance(node, InputNode) and node.get_property("incremental")
+                and node.get_property("file_path")]
+
+    def update_file_watcher(self, *args):
+        """Watch the files of incremental Input Nodes while Watch Files is checked."""
+        if self.file_watcher.files():
+            self.file_watcher.removePaths(self.file_watcher.files())
+        if not self.watch_checkbox.isChecked():
+            return
+        paths = {node.get_property("file_path") for node in self.watched_input_nodes()}
+        paths = [path for path in paths if os.path.exists(path)]
+        if paths:
+            self.file_watcher.addPaths(paths)
+
+    def on_node_property_changed(self, node, name, value):
+        if isinstance(node, InputNode) and name in ("file_path", "incremental"):
+            self.update_file_watcher()
+
+    def on_file_changed(self, path):
+        # A file that was replaced rather than appended to drops off the watch list
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        self.changed_files.add(path)
+        self.watch_timer.start()
+
+    def reload_changed_files(self):
+        changed, self.changed_files = self.changed_files, set()
+        for node in self.watched_input_nodes():
+            if node.get_property("file_path") in changed:
+                self.process_node(node, None, changes_only=True)
+        self.update_file_watcher()
 
     def run_selected_calculation_node(self):
         selected_nodes = self.graph.selected_nodes()
@@ -0,0 +1,234 @@
+"""Tests for incremental loading in initial.py.
+
+The Qt modules are replaced with stand-ins so the node classes can be used
+without a display. BaseNode only needs to store properties here.
+"""
+import sys
+import types
+
+import pandas as pd
+
+
+class StubBaseNode:
+    def __init__(self):
+        self.properties = {}
+
+    def add_input(self, name):
+        pass
+
+    def add_output(self, name):
+        pass
+
+    def add_text_input(self, name, label=""):
+        self.properties[name] = ""
+
+    def add_checkbox(self, name, label="", text="", state=False):
+        self.properties[name] = state
+
+    def add_combo_menu(self, name, label="", items=None):
+        self.properties[name] = items[0]
+
+    def get_property(self, name):
+        return self.properties[name]
+
+    def set_property(self, name, value):
+        self.properties[name] = value
+
+
+class StubQt:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+def stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: StubQt
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+
+
+stub_module("PySide6")
+stub_module("PySide6.QtWidgets")
+stub_module("PySide6.QtGui")
+stub_module("PySide6.QtCore", Signal=lambda *args: None)
+stub_module("NodeGraphQt", BaseNode=StubBaseNode)
+stub_module("requests")
+
+from initial import AggregateNode, CalculationNode, InputNode  # noqa: E402
+
+
+def make_input(path):
+    node = InputNode()
+    node.set_property("file_path", str(path))
+    node.set_property("incremental", True)
+    return node
+
+
+def write(path, text, mode="w"):
+    with open(path, mode, newline="") as f:
+        f.write(text)
+
+
+def test_append_parses_only_new_rows(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\na,1\nb,2\n")
+    node = make_input(path)
+    rows, is_delta = node.load_data(True)
+    assert not is_delta and len(rows) == 2
+
+    write(path, "a,3\n", "a")
+    rows, is_delta = node.load_data(True)
+    assert is_delta
+    assert list(rows.index) == [2]
+    assert node._data["x"].tolist() == [1, 2, 3]
+
+    rows, is_delta = node.load_data(True)
+    assert is_delta and rows.empty
+
+
+def test_truncated_file_is_reloaded(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\na,1\nb,2\n")
+    node = make_input(path)
+    node.load_data(True)
+
+    write(path, "g,x\nc,9\n")
+    rows, is_delta = node.load_data(True)
+    assert not is_delta
+    assert node._data["g"].tolist() == ["c"]
+
+
+def test_same_size_rewrite_is_reloaded(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\na,1\nb,2\n")
+    node = make_input(path)
+    node.load_data(True)
+
+    write(path, "g,x\na,1\nb,7\n")
+    rows, is_delta = node.load_data(True)
+    assert not is_delta
+    assert node._data["x"].tolist() == [1, 7]
+
+
+def test_partial_trailing_line(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\na,1\nb,2")
+    node = make_input(path)
+    node.load_data(True)
+    assert node._data["x"].tolist() == [1, 2]
+
+    rows, is_delta = node.load_data(True)
+    assert is_delta and rows.empty
+
+    write(path, "5\nc,3\n", "a")
+    rows, is_delta = node.load_data(True)
+    assert not is_delta
+    assert node._data["x"].tolist() == [1, 25, 3]
+    assert node._data.equals(pd.read_csv(path))
+
+
+def test_appended_rows_keep_column_types(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "name,x\nann,1.5\n")
+    node = make_input(path)
+    node.load_data(True)
+
+    write(path, ",2\n", "a")
+    rows, is_delta = node.load_data(True)
+    assert is_delta
+    assert node._data.dtypes.equals(pd.read_csv(path).dtypes)
+
+
+def test_header_only_file_then_append(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\n")
+    node = make_input(path)
+    node.load_data(True)
+    assert node._data.empty
+
+    write(path, "a,1\na,2\nb,10\n", "a")
+    node.load_data(True)
+    assert node._data.dtypes.equals(pd.read_csv(path).dtypes)
+    assert node._data["x"].tolist() == [1, 2, 10]
+
+
+def make_calculation(formula):
+    calculation = CalculationNode()
+    calculation.set_property("formula", formula)
+    calculation.set_property("row_wise", True)
+    return calculation
+
+
+def test_failed_delta_is_not_lost(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "x\n1\n2\n")
+    node = make_input(path)
+    calculation = make_calculation("df['x'].map(lambda v: 10 // v)")
+    node.load_data(True)
+    calculation.update_calculation(node._data, None)
+
+    write(path, "0\n", "a")
+    rows, is_delta = node.load_data(True)
+    data, delta, error = calculation.update_calculation(node._data, rows)
+    assert error
+
+    # The next append is recomputed in full, so the bad row fails again
+    write(path, "5\n", "a")
+    rows, is_delta = node.load_data(True)
+    data, delta, error = calculation.update_calculation(node._data, rows)
+    assert error and delta is None
+
+
+def test_misaligned_cache_recomputes_in_full(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "x\n1\n2\n")
+    node = make_input(path)
+    calculation = make_calculation("df['x'] * 2")
+    node.load_data(True)
+    calculation.update_calculation(node._data.iloc[:1], None)
+
+    write(path, "3\n", "a")
+    rows, is_delta = node.load_data(True)
+    data, delta, error = calculation.update_calculation(node._data, rows)
+    assert delta is None
+    assert data["Result"].tolist() == [2, 4, 6]
+
+
+def make_aggregate():
+    aggregate = AggregateNode()
+    aggregate.set_property("group_by", "g")
+    aggregate.set_property("column", "x")
+    return aggregate
+
+
+def test_incremental_aggregate_matches_full(tmp_path):
+    path = tmp_path / "log.csv"
+    write(path, "g,x\na,1\nb,2\na,4\n")
+    node = make_input(path)
+    aggregate = make_aggregate()
+    node.load_data(True)
+    aggregate.update_aggregate(node._data, None)
+
+    write(path, "b,6\nc,3\na,7\n", "a")
+    rows, is_delta = node.load_data(True)
+    assert is_delta
+    aggregate.update_aggregate(node._data, rows)
+
+    full = make_aggregate()
+    for function in AggregateNode.FUNCTIONS:
+        aggregate.set_property("function", function)
+        full.set_property("function", function)
+        incremental, error = aggregate.update_aggregate(node._data, rows.iloc[0:0])
+        expected, _ = full.update_aggregate(node._data, None)
+        assert error is None
+        assert incremental.equals(expected)
+
+
+def test_aggregate_recomputes_for_a_different_source():
+    aggregate = make_aggregate()
+    aggregate.update_aggregate(pd.DataFrame({"g": ["a"], "x": [1]}), None)
+
+    other = pd.DataFrame({"g": ["a", "a"], "x": [100, 5]})
+    data, error = aggregate.update_aggregate(other, other.iloc[1:])
+    assert error is None
+    assert data["x_sum"].tolist() == [105]